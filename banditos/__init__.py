@@ -0,0 +1 @@
+"""Los Banditos stock game: price fetching for the static site."""
@@ -0,0 +1,468 @@
+"""
+Fetch YTD daily closing prices for all Los Banditos stocks.
+- US stocks: Alpha Vantage API
+- DFEN (VanEck Defense ETF, EUR): justETF API (ISIN IE000YYE6WK5), or
+  Alpha Vantage with run(dfen_from_justetf=False)
+
+Writes data/prices.json and, unless run(update_html=False), updates the
+embedded PRICES in index.html.
+"""
+
+import http.client
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import urllib.request
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import NamedTuple
+
+API_KEY = os.environ.get("AV_API_KEY", "")
+
+
+class Stock(NamedTuple):
+    ticker: str
+    av_symbol: str
+    p0: float
+    currency: str
+
+
+STOCKS = (
+    Stock("HOOD", "HOOD", 115.48, "USD"),
+    Stock("TTD",  "TTD",  38.19,  "USD"),
+    Stock("GMAB", "GMAB", 31.18,  "USD"),
+    Stock("XXI",  "XXI",  8.85,   "USD"),
+    Stock("FOUR", "FOUR", 63.31,  "USD"),
+    Stock("DFEN", "DFEN", 52.49,  "EUR"),
+)
+
+DFEN_ISIN = "IE000YYE6WK5"
+START_DATE = "2026-01-02"
+# Format of the "updated" field in prices.json
+UPDATED_FORMAT = "%Y-%m-%d %H:%M UTC"
+AV_HOST = "www.alphavantage.co"
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# Alpha Vantage free tier: 5 requests per minute
+RATE_LIMIT_CALLS = 5
+RATE_LIMIT_WINDOW = 60
+
+# Raw Alpha Vantage responses, one file per symbol per UTC day
+CACHE_DIR = os.path.join(ROOT, "data", ".av_cache")
+# US regular session in UTC (hour, minute)
+MARKET_OPEN = (13, 30)
+MARKET_CLOSE = (20, 0)
+# How long a previous prices.json is reused without refetching, in seconds
+PRICES_TTL_OPEN = 15 * 60
+PRICES_TTL_CLOSED = 6 * 60 * 60
+
+# Delimiters of the embedded PRICES block in index.html
+PRICES_BLOCK_START = "const PRICES = {"
+PRICES_BLOCK_END = "\n};"
+
+# Idle keep-alive connections to AV_HOST, so each call skips the TCP+TLS handshake
+_AV_POOL = queue.LifoQueue()
+
+# Start times of the most recent Alpha Vantage calls that reached the network
+_AV_CALLS = deque(maxlen=RATE_LIMIT_CALLS)
+_AV_CALLS_LOCK = threading.Lock()
+
+
+def _cache_path(symbol):
+    return os.path.join(CACHE_DIR, f"{symbol}-{datetime.now(timezone.utc):%Y%m%d}.json")
+
+
+def _prune_cache():
+    """Delete cached responses from earlier UTC days; only today's are ever read."""
+    today = f"{datetime.now(timezone.utc):%Y%m%d}"
+    for name in os.listdir(CACHE_DIR):
+        stem, sep, _ = name.partition(".json")
+        day = stem.rpartition("-")[2]
+        if sep and len(day) == 8 and day.isdigit() and day != today:
+            try:
+                os.remove(os.path.join(CACHE_DIR, name))
+            except OSError:
+                pass
+
+
+def _market_open(t):
+    return t.weekday() < 5 and MARKET_OPEN <= (t.hour, t.minute) < MARKET_CLOSE
+
+
+def _fresh(fetched, open_ttl):
+    """Data fetched at `fetched` (UTC) is good for `open_ttl` seconds while the
+    market is open, otherwise until the next open."""
+    now = datetime.now(timezone.utc)
+    if _market_open(now):
+        return (now - fetched).total_seconds() < open_ttl
+    session_open = now.replace(hour=MARKET_OPEN[0], minute=MARKET_OPEN[1], second=0, microsecond=0)
+    opened_since = now.weekday() < 5 and fetched < session_open <= now
+    return not _market_open(fetched) and not opened_since
+
+
+def _cache_fresh(path):
+    return _fresh(datetime.fromtimestamp(os.path.getmtime(path), timezone.utc), 60)
+
+
+def _write_atomic(path, text):
+    """Write through a sibling temp file so readers never see a half-written file."""
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # Don't leave e.g. index.html.tmp lying around in the repo
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _read_cached_series(path):
+    """Return the cached time series at `path`, or None if it is missing or unreadable."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)["Time Series (Daily)"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _read_last_modified(path):
+    """Return the saved Last-Modified value at `path`, or None if it is missing or unreadable."""
+    try:
+        with open(path, "r") as f:
+            return f.read().strip() or None
+    except (OSError, ValueError):
+        return None
+
+
+def _reserve_av_call():
+    """Block until a call fits in the rolling rate-limit window, then record it."""
+    while True:
+        with _AV_CALLS_LOCK:
+            now = time.monotonic()
+            if len(_AV_CALLS) < RATE_LIMIT_CALLS or now - _AV_CALLS[0] >= RATE_LIMIT_WINDOW:
+                _AV_CALLS.append(now)
+                return now
+            wait = RATE_LIMIT_WINDOW - (now - _AV_CALLS[0])
+        # Sleep without the lock so _release_av_call is never held up; re-check afterwards
+        print(f"  Waiting {wait:.0f}s for rate limit...")
+        time.sleep(wait)
+
+
+def _release_av_call(started):
+    """Give back a slot taken by _reserve_av_call for a call that never reached the server."""
+    with _AV_CALLS_LOCK:
+        if started in _AV_CALLS:
+            _AV_CALLS.remove(started)
+
+
+def _av_exchange(conn, path, headers):
+    """Send one GET on `conn`; pool the connection on success, close it on failure."""
+    try:
+        conn.request("GET", path, headers=headers)
+        resp = conn.getresponse()
+        if resp.status == 304:
+            resp.read()
+            data = None
+        elif resp.status == 200:
+            data = json.load(resp)
+        else:
+            raise http.client.HTTPException(f"HTTP {resp.status} {resp.reason}")
+    except Exception:
+        conn.close()
+        raise
+    _AV_POOL.put(conn)
+    return data, resp.getheader("Last-Modified")
+
+
+def _av_get_json(path, if_modified_since=None):
+    """GET a path from Alpha Vantage, reusing a pooled keep-alive connection if one is idle.
+
+    Returns (data, last_modified); data is None if the server answered 304.
+    """
+    headers = {"User-Agent": "LosBanditos/1.0"}
+    if if_modified_since:
+        headers["If-Modified-Since"] = if_modified_since
+    # Take the rate-limit slot first: waiting for it can outlast an idle connection
+    started = _reserve_av_call()
+    try:
+        return _av_exchange(_AV_POOL.get_nowait(), path, headers)
+    except queue.Empty:
+        pass
+    except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+        # The server dropped the idle connection before reading the request; retry once
+        pass
+    conn = http.client.HTTPSConnection(AV_HOST, timeout=30)
+    try:
+        conn.connect()
+    except OSError:
+        # Never reached Alpha Vantage, so it did not count against the quota
+        conn.close()
+        _release_av_call(started)
+        raise
+    return _av_exchange(conn, path, headers)
+
+
+def fetch_daily_av(symbol):
+    """Fetch daily time series from Alpha Vantage."""
+    path = (
+        "/query?function=TIME_SERIES_DAILY"
+        f"&symbol={symbol}&outputsize=compact&apikey={API_KEY}"
+    )
+    cache_path = _cache_path(symbol)
+    # Last-Modified of the cached response, sent back as If-Modified-Since
+    lastmod_path = cache_path + ".last-modified"
+    cached = _read_cached_series(cache_path)
+    if cached is not None and _cache_fresh(cache_path):
+        print(f"  Using cached response for {symbol}")
+        return cached
+
+    if_modified_since = _read_last_modified(lastmod_path) if cached is not None else None
+
+    print(f"  Fetching {symbol} from Alpha Vantage...")
+    try:
+        data, last_modified = _av_get_json(path, if_modified_since)
+        if data is None:
+            print(f"  {symbol} not modified, using cached response")
+            try:
+                os.utime(cache_path)
+            except OSError:
+                pass
+            return cached
+        if "Time Series (Daily)" not in data:
+            msg = data.get("Note", data.get("Information", data.get("Error Message", "Unknown")))
+            print(f"  WARNING: No data for {symbol}: {msg}")
+            return None
+    except Exception as e:
+        print(f"  ERROR fetching {symbol}: {e}")
+        return None
+
+    # The cache only saves quota on later runs; a failed write must not lose this response
+    try:
+        _write_atomic(cache_path, json.dumps(data))
+        if last_modified:
+            _write_atomic(lastmod_path, last_modified)
+        elif os.path.exists(lastmod_path):
+            # An older Last-Modified would not describe the body just cached
+            os.remove(lastmod_path)
+    except OSError as e:
+        print(f"  WARNING: Could not cache response for {symbol}: {e}")
+    return data["Time Series (Daily)"]
+
+
+def fetch_dfen_justetf():
+    """Fetch DFEN EUR prices from justETF API (same source as justetf.com chart)."""
+    print(f"  Fetching DFEN from justETF (ISIN {DFEN_ISIN})...")
+    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    url = (
+        f"https://www.justetf.com/api/etfs/{DFEN_ISIN}/performance-chart"
+        f"?locale=en&currency=EUR&valuesType=MARKET_VALUE"
+        f"&reduceData=false&includeDividends=true"
+        f"&dateFrom=2025-12-31&dateTo={today}"
+    )
+    try:
+        req = urllib.request.Request(url, headers={
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+            "Accept": "application/json",
+        })
+        with urllib.request.urlopen(req, timeout=30) as resp:
+            data = json.load(resp)
+
+        series = data.get("series", [])
+        if not series:
+            print("  WARNING: No justETF series data for DFEN")
+            return None
+
+        daily = {}
+        for point in series:
+            dt = point.get("date", "")
+            val = point.get("value", {}).get("raw")
+            if dt >= START_DATE and val is not None:
+                # Skip weekends (Sat=5, Sun=6)
+                d = datetime.strptime(dt, "%Y-%m-%d")
+                if d.weekday() < 5:
+                    daily[dt] = round(val, 2)
+
+        print(f"  DFEN: Got {len(daily)} trading days from justETF (weekends removed)")
+        return daily
+
+    except Exception as e:
+        print(f"  ERROR fetching DFEN from justETF: {e}")
+        return None
+
+
+def load_existing():
+    """Return the previous prices.json and its "updated" time, or (None, None)."""
+    path = os.path.join(ROOT, "data", "prices.json")
+    try:
+        with open(path, "r") as f:
+            existing = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None, None
+    try:
+        updated = datetime.strptime(existing.get("updated", ""), UPDATED_FORMAT).replace(tzinfo=timezone.utc)
+    except ValueError:
+        updated = None
+    return existing, updated
+
+
+def existing_fresh(existing, updated, tickers):
+    """True if the previous run fetched every ticker and is recent enough to reuse as-is."""
+    if existing is None or updated is None:
+        return False
+    stocks = existing.get("stocks", {})
+    # "stale" entries were carried over from an earlier run after a failed fetch
+    if any(t not in stocks or "error" in stocks[t] or stocks[t].get("stale") for t in tickers):
+        return False
+    age = (datetime.now(timezone.utc) - updated).total_seconds()
+    return age < PRICES_TTL_CLOSED and _fresh(updated, PRICES_TTL_OPEN)
+
+
+def update_index_html(stocks_data):
+    """Replace the embedded PRICES object in index.html with fresh data."""
+    html_path = os.path.join(ROOT, "index.html")
+    try:
+        with open(html_path, "r") as f:
+            html = f.read()
+    except FileNotFoundError:
+        print("  WARNING: index.html not found, skipping embedded update")
+        return
+
+    # Key daily closes by day offset from START_DATE; the page expands them back to dates
+    start_date = date.fromisoformat(START_DATE)
+    lines = [PRICES_BLOCK_START, f'  "start": "{START_DATE}",']
+    for ticker, sd in stocks_data.items():
+        daily = {(date.fromisoformat(d) - start_date).days: v for d, v in sd.get("daily", {}).items()}
+        daily_str = json.dumps(daily, separators=(",", ":"))
+        lines.append(f'  "{ticker}": {{')
+        lines.append(f'    "p0": {sd["p0"]}, "p1": {sd.get("p1", sd["p0"])}, "currency": "{sd["currency"]}",')
+        lines.append(f'    "daily": {daily_str}')
+        lines.append("  },")
+    lines.append("};")
+    new_prices = "\n".join(lines)
+
+    start = html.find(PRICES_BLOCK_START)
+    end = html.find(PRICES_BLOCK_END, start)
+    if start == -1 or end == -1:
+        print("  WARNING: Could not find PRICES block in index.html")
+        return
+    end += len(PRICES_BLOCK_END)
+    if html[start:end] == new_prices:
+        print("  Embedded PRICES in index.html already up to date")
+        return
+    html = html[:start] + new_prices + html[end:]
+    _write_atomic(html_path, html)
+    print("  Updated embedded PRICES in index.html")
+
+
+def dfen_entry(dfen_daily, existing):
+    """Build the DFEN entry from justETF closes, falling back to the previous run."""
+    if dfen_daily:
+        first_date = min(dfen_daily.keys())
+        latest_date = max(dfen_daily.keys())
+        p0 = dfen_daily[first_date]
+        p1 = dfen_daily[latest_date]
+        ytd = round((p1 - p0) / p0 * 100, 2)
+        print(f"  DFEN: €{p0} -> €{p1} ({ytd:+.1f}%) [{len(dfen_daily)} days]")
+        return {
+            "p0": p0, "p1": p1, "ytd": ytd,
+            "currency": "EUR", "daily": dfen_daily
+        }
+    if existing and "DFEN" in existing.get("stocks", {}):
+        print(f"  Using cached data for DFEN")
+        return {**existing["stocks"]["DFEN"], "stale": True}
+    return {
+        "p0": 52.49, "p1": 52.49, "currency": "EUR",
+        "daily": {}, "error": "No data available"
+    }
+
+
+def run(update_html=True, dfen_from_justetf=True):
+    """Fetch all prices, write data/prices.json and optionally refresh index.html."""
+    if not API_KEY:
+        print("ERROR: Set AV_API_KEY environment variable")
+        sys.exit(1)
+
+    print("Los Banditos Price Updater")
+    print("=" * 40)
+
+    existing, last_updated = load_existing()
+    if existing_fresh(existing, last_updated, [s.ticker for s in STOCKS]):
+        print(f"Prices from {existing['updated']} are still fresh, nothing to fetch")
+        return
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    _prune_cache()
+    updated = datetime.now(timezone.utc).strftime(UPDATED_FORMAT)
+    result = {
+        "updated": updated,
+        "start_date": START_DATE,
+        "stocks": {}
+    }
+
+    # --- Fetch all sources in parallel; _reserve_av_call keeps Alpha Vantage under its rate limit ---
+    av_stocks = [s for s in STOCKS if not (dfen_from_justetf and s.ticker == "DFEN")]
+    with ThreadPoolExecutor(max_workers=RATE_LIMIT_CALLS + 1) as pool:
+        dfen_future = pool.submit(fetch_dfen_justetf) if dfen_from_justetf else None
+        all_series = list(pool.map(fetch_daily_av, [s.av_symbol for s in av_stocks]))
+        dfen_daily = dfen_future.result() if dfen_future else None
+
+    for stock, ts in zip(av_stocks, all_series):
+        ticker = stock.ticker
+        p0 = stock.p0
+
+        if ts is None:
+            if existing and ticker in existing.get("stocks", {}):
+                print(f"  Using cached data for {ticker}")
+                result["stocks"][ticker] = {**existing["stocks"][ticker], "stale": True}
+            else:
+                result["stocks"][ticker] = {
+                    "p0": p0, "p1": p0, "currency": stock.currency,
+                    "daily": {}, "error": "No data available"
+                }
+            continue
+
+        daily = {d: round(float(v["4. close"]), 2) for d, v in ts.items() if d >= START_DATE}
+
+        if daily:
+            # ISO dates compare lexically, so no sort is needed
+            latest_date = max(daily)
+            latest_price = daily[latest_date]
+            ytd = round((latest_price - p0) / p0 * 100, 2)
+            print(f"  {ticker}: ${p0} -> ${latest_price} ({ytd:+.1f}%) [{len(daily)} days]")
+        else:
+            latest_price = p0
+            ytd = 0
+            print(f"  {ticker}: No YTD data found")
+
+        result["stocks"][ticker] = {
+            "p0": p0, "p1": latest_price, "ytd": ytd,
+            "currency": stock.currency, "daily": daily
+        }
+
+    # --- DFEN from justETF ---
+    if dfen_from_justetf:
+        result["stocks"]["DFEN"] = dfen_entry(dfen_daily, existing)
+
+    # --- Write prices.json ---
+    out_path = os.path.join(ROOT, "data", "prices.json")
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    # Read by the page, not by people: skip the pure-Python indent path
+    _write_atomic(out_path, json.dumps(result, separators=(",", ":")))
+    print(f"\nWritten to {out_path}")
+
+    # --- Update embedded data in index.html ---
+    if update_html:
+        if existing and existing.get("stocks") == result["stocks"]:
+            print("  Prices unchanged, leaving index.html alone")
+        else:
+            update_index_html(result["stocks"])
+
+    print(f"Done! Updated: {updated}")